@@ -7,21 +7,122 @@ They test the full MCP server functionality against a real Claude.ai session.
 Usage:
     pytest tests/ -v --run-integration
 
+    # Keep the MCP server alive between pytest invocations (via tests/mcp_daemon.py)
+    pytest tests/ -v --run-integration --mcp-persistent
+
+    # Stop the persistent MCP server daemons
+    pytest --mcp-daemon-stop
+
+    # Run in parallel, one MCP server + test project per xdist worker
+    pytest tests/ -v --run-integration -n auto --dist=loadscope
+
+    # Each xdist worker's browser uses a copy of the profile next to it
+    # (e.g. ~/.claude_project_mcp/chrome-profile-gw0), refreshed when the
+    # base profile logs in again. Remove the copies with:
+    rm -rf ~/.claude_project_mcp/chrome-profile-gw*
+
+    # Nightly: also run tests marked slow (deselected by default in pytest.ini)
+    pytest tests/ -v --run-integration -m "slow or integration"
+
+    # Reuse the test project between runs while debugging (it is not deleted)
+    MCP_DEBUG_CACHE=1 pytest tests/ -v --run-integration --lf
+
 WARNING: These tests will create/modify/delete REAL projects on Claude.ai!
 """
 
 import pytest
 import subprocess
-import json
+import functools
+import logging
 import os
+import pickle
+import re
+import selectors
+import shutil
+import signal
+import socket
 import sys
 import asyncio
 from typing import Generator, Any, Optional
 from dataclasses import dataclass
 from pathlib import Path
+import tempfile
 import time
 import uuid
 
+import orjson
+
+
+# Repository root; the server is launched from here.
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+log = logging.getLogger(__name__)
+
+# Command used to launch the MCP server from the project root.
+SERVER_COMMAND = ["npx", "tsx", "src/server.ts"]
+
+# How long to wait for the server to answer its first request, and how
+# often to retry while it is still starting up.
+READY_TIMEOUT = 10.0
+READY_POLL_INTERVAL = 0.1
+
+# Line src/server.ts logs to stderr once its stdio transport is connected.
+# Startup waits up to READY_LOG_TIMEOUT for it, falling back to the
+# tools/list probe if stderr stays silent for READY_LOG_GRACE (e.g. when
+# LOG_LEVEL hides info messages).
+READY_LOG_LINE = b"Server connected and ready"
+READY_LOG_TIMEOUT = 5.0
+READY_LOG_GRACE = 0.5
+
+# Default time to wait for a response (browser operations can be slow).
+REQUEST_TIMEOUT = 120
+
+# How long send_and_await waits for Claude's reply (the same limit as the
+# server's own waitForResponse), and how often it polls the page.
+RESPONSE_TIMEOUT = 120
+RESPONSE_POLL_INTERVAL = 0.5
+
+# get_response's text when the page has no assistant message yet.
+NO_RESPONSE_TEXT = "No response found"
+
+# Words that mark a chat error banner as an actual error (as checked by the
+# server's waitForResponse).
+CHAT_ERROR_WORDS = ("error", "limit")
+
+# Buffer size for reads from the server's stdio socket and stderr pipe.
+PIPE_BUFFER_SIZE = 65536
+
+# Kernel send/receive buffer size for the server's stdio socket.
+SOCKET_BUFFER_SIZE = 262144
+
+# pytest-xdist worker id ("gw0", "gw1", ...); "gw0" when not running under xdist.
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+
+# Relay started by --mcp-persistent; it owns the server and listens on a
+# per-worker Unix socket (kept in the temp dir, as socket paths are short).
+DAEMON_SCRIPT = PROJECT_ROOT / "tests" / "mcp_daemon.py"
+DAEMON_SOCKET = Path(tempfile.gettempdir()) / f"mcp_test_{XDIST_WORKER}.sock"
+
+# How long a running daemon gets to answer the ping sent on connect, and
+# to exit when it is replaced.
+DAEMON_PING_TIMEOUT = 2.0
+DAEMON_STOP_TIMEOUT = 5.0
+
+# Server environment variables a running daemon must match to be reused.
+DAEMON_SETTINGS = ("HEADED", "SLOW_MO", "CHROME_PROFILE")
+
+# When set, the session test project is pickled and reused by later runs
+# instead of being created and deleted every time.
+DEBUG_CACHE = os.environ.get("MCP_DEBUG_CACHE") == "1"
+
+# Browser profile used by the server when CHROME_PROFILE is not set.
+DEFAULT_CHROME_PROFILE = Path.home() / ".claude_project_mcp" / "chrome-profile"
+
+# Files holding a profile's login state; a worker's profile copy is
+# refreshed when the base profile's are newer than when it was copied.
+PROFILE_LOGIN_FILES = ("Default/Cookies", "Default/Network/Cookies")
+PROFILE_COPY_STAMP = ".pytest_copied_at"
+
 
 def pytest_addoption(parser):
     """Add custom command line options."""
@@ -49,27 +150,94 @@ def pytest_addoption(parser):
         default=False,
         help="Keep the test project after tests complete (for debugging)",
     )
+    parser.addoption(
+        "--mcp-persistent",
+        action="store_true",
+        default=False,
+        help="Reuse a running MCP server across pytest invocations (started on first use)",
+    )
+    parser.addoption(
+        "--mcp-daemon-stop",
+        action="store_true",
+        default=False,
+        help="Stop the MCP server daemons started by --mcp-persistent when the session ends",
+    )
 
 
 def pytest_configure(config):
-    """Configure custom markers."""
+    """Configure custom markers and the per-session MCP bookkeeping."""
     config.addinivalue_line(
         "markers", "integration: mark test as integration test (requires --run-integration)"
     )
+    # Every MCPClient started this session, and errors hit during cleanup;
+    # both are handled in pytest_sessionfinish.
+    config._mcp_clients = []
+    config._mcp_teardown_errors = []
+    # Number of tests deselected only for lacking --run-integration.
+    config._mcp_integration_deselected = 0
 
 
+@pytest.hookimpl(trylast=True)
 def pytest_collection_modifyitems(config, items):
-    """Skip integration tests unless --run-integration is passed."""
+    """
+    Deselect integration tests unless --run-integration is passed.
+
+    Runs after -k/-m filtering, so only tests that selection kept are
+    counted as deselected for being integration tests.
+    """
     if config.getoption("--run-integration"):
         return
 
-    skip_integration = pytest.mark.skip(reason="Need --run-integration option to run")
+    selected, deselected = [], []
     for item in items:
-        if "integration" in item.keywords:
-            item.add_marker(skip_integration)
+        (deselected if item.get_closest_marker("integration") else selected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+    config._mcp_integration_deselected = len(deselected)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Kill any MCP server left running and report collected teardown errors."""
+    # With integration tests deselected by default, a run left empty by that
+    # alone is expected; an empty -k/-m selection still reports as such.
+    if exitstatus == pytest.ExitCode.NO_TESTS_COLLECTED and session.config._mcp_integration_deselected:
+        session.exitstatus = pytest.ExitCode.OK
+
+    for client in session.config._mcp_clients:
+        process = client.process
+        if process is None or client.daemon_socket is not None:
+            continue
+
+        process.kill()
+        try:
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            pass
+        # npx leaves tsx/node children behind; the server was started in its
+        # own session, so its process group id is its pid.
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    # Under xdist the controller stops every worker's daemon
+    if session.config.getoption("--mcp-daemon-stop") and "PYTEST_XDIST_WORKER" not in os.environ:
+        for pid_file in _daemon_dir(session.config).glob("daemon_*.pid"):
+            # The daemon stops its server and removes its own PID file
+            try:
+                os.kill(int(pid_file.read_text()), signal.SIGTERM)
+            except (OSError, ValueError):
+                pid_file.unlink(missing_ok=True)
 
+    errors = session.config._mcp_teardown_errors
+    if errors:
+        raise RuntimeError(
+            "Errors during MCP test teardown:\n" + "\n".join(f"  - {e}" for e in errors)
+        )
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class MCPResponse:
     """Represents a response from the MCP server."""
     success: bool
@@ -81,79 +249,434 @@ class MCPClient:
     """
     Client for communicating with the Claude Project MCP server.
 
-    Uses subprocess to spawn the MCP server and communicate via stdio.
+    Uses subprocess to spawn the MCP server and communicate via stdio. The
+    server's stdin/stdout are one end of a Unix socketpair rather than two
+    pipes; node treats a socket on fd 0/1 like any other stdio stream.
+
+    When ``daemon_socket`` is given the client instead connects to a
+    tests/mcp_daemon.py relay listening there, starting the daemon (which
+    writes its PID to ``daemon_pid_file``) if nothing answers a ping. The
+    daemon and its server keep running after ``stop()`` for later sessions.
+    The settings a daemon was started with are recorded next to its PID
+    file, and a daemon whose settings differ from this client's is replaced.
     """
 
-    def __init__(self, headed: bool = False, slow_mo: int = 0):
+    def __init__(
+        self,
+        headed: bool = False,
+        slow_mo: int = 0,
+        daemon_socket: Optional[Path] = None,
+        daemon_pid_file: Optional[Path] = None,
+        chrome_profile: Optional[Path] = None,
+    ):
         self.headed = headed
         self.slow_mo = slow_mo
+        self.daemon_socket = daemon_socket
+        self.daemon_pid_file = daemon_pid_file
+        self.chrome_profile = chrome_profile
         self.process: Optional[subprocess.Popen] = None
         self.request_id = 0
+        # Reused JSON-RPC envelope; only id/method/params change per request.
+        self._request = {"jsonrpc": "2.0", "id": 0, "method": "", "params": {}}
+        # Serialized tools/call envelope up to the arguments, per tool name.
+        self._tool_prefixes: dict = {}
+        self._stdin = None
+        self._stderr = None
+        self._send = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._chunk = memoryview(bytearray(PIPE_BUFFER_SIZE))
+        # Bytes read from stdout that do not yet form a complete message,
+        # responses that arrived before anyone asked for them (keyed by id),
+        # and ids whose caller gave up waiting.
+        self._read_buffer = bytearray()
+        self._responses: dict = {}
+        self._abandoned: set = set()
+        # Tail of the server's stderr (last PIPE_BUFFER_SIZE bytes).
+        self.stderr_output = bytearray()
         self._started = False
 
     def start(self) -> None:
-        """Start the MCP server process."""
+        """Start the MCP server process (or connect to the persistent daemon)."""
         if self._started:
             return
 
-        env = os.environ.copy()
+        if self.daemon_socket is None:
+            self._spawn()
+            ready = self._wait_for_ready_line()
+        else:
+            # The daemon forwards every reply to whoever is connected, including
+            # late replies to an earlier session's requests; a random 48-bit id
+            # base keeps those from matching this session's ids.
+            self.request_id = uuid.uuid4().int >> 80
+            if self._connect_daemon():
+                ready = True
+            else:
+                self._start_daemon()
+                ready = False
+        self._started = True
+
+        if not ready:
+            self._wait_until_ready()
+
+    def _server_env(self) -> dict:
+        env = _base_env().copy()
         env["HEADED"] = "true" if self.headed else "false"
         if self.slow_mo:
             env["SLOW_MO"] = str(self.slow_mo)
+        if self.chrome_profile:
+            env["CHROME_PROFILE"] = str(self.chrome_profile)
+        return env
+
+    def _spawn(self) -> None:
+        """Spawn a server owned by this client, with a socketpair as its stdio."""
+        sock, child_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        for s in (sock, child_sock):
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+
+        with child_sock:
+            self.process = subprocess.Popen(
+                SERVER_COMMAND,
+                cwd=PROJECT_ROOT,
+                stdin=child_sock,
+                stdout=child_sock,
+                stderr=subprocess.PIPE,
+                env=self._server_env(),
+                bufsize=0,
+                start_new_session=True,
+            )
+        self._attach(sock, self.process.stderr)
 
-        # Start the MCP server
-        project_root = Path(__file__).parent.parent
+    def _daemon_settings(self) -> dict:
+        env = self._server_env()
+        return {name: env.get(name) for name in DAEMON_SETTINGS}
+
+    def _daemon_settings_file(self) -> Path:
+        return self.daemon_pid_file.with_suffix(".json")
+
+    def _connect_daemon(self) -> bool:
+        """
+        Connect to a running daemon, returning False if none answers a ping.
+
+        A daemon started with different headed/slow-mo/profile settings, or
+        one that does not answer, is stopped instead, so the caller starts a
+        fresh one without two servers fighting over the browser profile.
+        """
+        try:
+            settings = orjson.loads(self._daemon_settings_file().read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            settings = None
+        if settings != self._daemon_settings():
+            self._stop_daemon("server settings changed")
+            return False
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(self.daemon_socket))
+        except OSError:
+            sock.close()
+            self._stop_daemon("socket not accepting connections")
+            return False
+
+        self._attach(sock)
+        try:
+            self._send_request("ping", timeout=DAEMON_PING_TIMEOUT)
+        except (RuntimeError, OSError, ValueError):
+            self._disconnect()
+            self._stop_daemon("server did not answer ping")
+            return False
+        return True
+
+    def _stop_daemon(self, reason: str) -> None:
+        """Stop the daemon recorded in ``daemon_pid_file`` (if any) and wait for it to exit."""
+        try:
+            pid = int(self.daemon_pid_file.read_text())
+            os.kill(pid, signal.SIGTERM)
+        except (OSError, ValueError):
+            return
+
+        log.warning("Restarting MCP daemon %d: %s", pid, reason)
+        # Wait for it to exit, as on the way out it unlinks the socket path
+        # the replacement is about to bind.
+        deadline = time.monotonic() + DAEMON_STOP_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                # Reap it if this process started it, so it is not left a zombie
+                os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                pass
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return
+            time.sleep(READY_POLL_INTERVAL)
+        raise RuntimeError(f"MCP daemon {pid} did not exit after {DAEMON_STOP_TIMEOUT}s")
+
+    def _start_daemon(self) -> None:
+        """Launch tests/mcp_daemon.py detached and connect once it is listening."""
+        self.daemon_pid_file.parent.mkdir(parents=True, exist_ok=True)
+        self._daemon_settings_file().write_bytes(orjson.dumps(self._daemon_settings()))
         self.process = subprocess.Popen(
-            ["npx", "tsx", "src/server.ts"],
-            cwd=project_root,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            env=env,
-            text=True,
-            bufsize=1,
+            [
+                sys.executable, str(DAEMON_SCRIPT),
+                "--socket", str(self.daemon_socket),
+                "--pid-file", str(self.daemon_pid_file),
+                "--log-file", str(self.daemon_pid_file.with_suffix(".log")),
+                "--", *SERVER_COMMAND,
+            ],
+            cwd=PROJECT_ROOT,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=self._server_env(),
+            start_new_session=True,
         )
-        self._started = True
 
-        # Give server time to initialize
-        time.sleep(2)
+        # The daemon writes its pid file only once it is listening, so until
+        # the file holds this daemon's pid the socket path may still belong
+        # to a predecessor.
+        expected_pid = str(self.process.pid)
+        deadline = time.monotonic() + READY_TIMEOUT
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                if self.daemon_pid_file.read_text() != expected_pid:
+                    raise ConnectionRefusedError("MCP daemon pid file not written yet")
+                sock.connect(str(self.daemon_socket))
+                break
+            except OSError as e:
+                sock.close()
+                if self.process.poll() is not None:
+                    raise RuntimeError(
+                        f"MCP daemon exited during startup (code {self.process.returncode})"
+                    ) from e
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"MCP daemon not listening after {READY_TIMEOUT}s") from e
+                time.sleep(READY_POLL_INTERVAL)
+        self._attach(sock)
+
+    def _attach(self, sock: socket.socket, stderr_raw=None) -> None:
+        """
+        Use ``sock`` as the server's stdio and register its output for evented reads.
+
+        Reads never block: the socket (and stderr, when piped) are drained
+        through a selector, so a wedged server surfaces as a timeout and an
+        unread stderr pipe can never fill up. The stderr pipe is made
+        non-blocking; the socket stays blocking so ``sendall`` can wait for
+        buffer space, and is only read once the selector reports data.
+        """
+        self._stdin = sock
+        self._stderr = stderr_raw
+        self._send = sock.sendall
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(sock, selectors.EVENT_READ, sock.recv_into)
+        if stderr_raw is not None:
+            os.set_blocking(stderr_raw.fileno(), False)
+            self._selector.register(stderr_raw, selectors.EVENT_READ, stderr_raw.readinto)
+
+    def _disconnect(self) -> None:
+        """Close the connection to the server and drop any buffered output."""
+        if self._selector:
+            self._selector.close()
+        for stream in (self._stdin, self._stderr):
+            if stream:
+                stream.close()
+        self._stdin = None
+        self._stderr = None
+        self._send = None
+        self._selector = None
+        self._read_buffer.clear()
+        self._responses.clear()
+
+    def _wait_for_ready_line(self) -> bool:
+        """
+        Watch the server's stderr for READY_LOG_LINE.
+
+        Returns False if it does not appear, so the caller can fall back to
+        probing with a request.
+        """
+        start = time.monotonic()
+        deadline = start + READY_LOG_TIMEOUT
+        while READY_LOG_LINE not in self.stderr_output:
+            now = time.monotonic()
+            if now >= deadline or (not self.stderr_output and now - start >= READY_LOG_GRACE):
+                return False
+            try:
+                self._poll(min(deadline - now, READY_POLL_INTERVAL))
+            except RuntimeError as e:
+                raise RuntimeError(
+                    f"MCP server exited during startup (code {self.process.poll()})"
+                ) from e
+        return True
+
+    def _wait_until_ready(self) -> None:
+        """Poll ``tools/list`` until the server answers or READY_TIMEOUT elapses."""
+        deadline = time.monotonic() + READY_TIMEOUT
+        while True:
+            try:
+                self._send_request("tools/list", timeout=max(deadline - time.monotonic(), 0))
+                return
+            except (RuntimeError, OSError, ValueError) as e:
+                if self.process and self.process.poll() is not None:
+                    raise RuntimeError(
+                        f"MCP server exited during startup (code {self.process.returncode})"
+                    ) from e
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"MCP server not ready after {READY_TIMEOUT}s") from e
+                time.sleep(READY_POLL_INTERVAL)
 
     def stop(self) -> None:
-        """Stop the MCP server process."""
-        if self.process:
-            self.process.terminate()
+        """Stop the MCP server process (the persistent daemon is left running)."""
+        self._disconnect()
+        if self.daemon_socket is None and self.process:
+            # Signal the whole process group so tsx's node child exits too.
+            try:
+                os.killpg(self.process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
             try:
                 self.process.wait(timeout=5)
             except subprocess.TimeoutExpired:
                 self.process.kill()
-            self.process = None
-            self._started = False
+        self.process = None
+        self._started = False
 
-    def _send_request(self, method: str, params: dict = None) -> dict:
-        """Send a JSON-RPC request to the MCP server."""
-        if not self.process or not self.process.stdin or not self.process.stdout:
+    def _write_request(self, method: str, params: dict = None) -> int:
+        """Write a JSON-RPC request without waiting for the reply. Returns its id."""
+        if not self._send:
+            raise RuntimeError("MCP server not started")
+
+        self.request_id += 1
+        request = self._request
+        request["id"] = self.request_id
+        request["method"] = method
+        request["params"] = params or {}
+
+        # The server's stdio transport is newline-delimited JSON; send the
+        # whole message, newline included, in a single write.
+        self._send(orjson.dumps(request, option=orjson.OPT_APPEND_NEWLINE))
+        return self.request_id
+
+    def _write_tool_call(self, tool_name: str, arguments: dict = None) -> int:
+        """
+        Write a ``tools/call`` request without waiting for the reply. Returns its id.
+
+        Only the arguments are encoded per call; they are spliced between the
+        tool's cached envelope prefix and an id suffix.
+        """
+        if not self._send:
             raise RuntimeError("MCP server not started")
 
+        prefix = self._tool_prefixes.get(tool_name)
+        if prefix is None:
+            prefix = self._tool_prefixes[tool_name] = (
+                b'{"jsonrpc":"2.0","method":"tools/call","params":{"name":'
+                + orjson.dumps(tool_name)
+                + b',"arguments":'
+            )
+
         self.request_id += 1
-        request = {
-            "jsonrpc": "2.0",
-            "id": self.request_id,
-            "method": method,
-            "params": params or {},
-        }
+        self._send(b"".join((
+            prefix,
+            orjson.dumps(arguments or {}),
+            b'},"id":%d}\n' % self.request_id,
+        )))
+        return self.request_id
+
+    def _poll(self, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for server output and consume what arrived."""
+        for key, _ in self._selector.select(timeout):
+            try:
+                n = key.data(self._chunk)
+            except BlockingIOError:
+                continue
+            if n is None:
+                continue
+            chunk = self._chunk[:n]
 
-        request_str = json.dumps(request) + "\n"
-        self.process.stdin.write(request_str)
-        self.process.stdin.flush()
+            if key.fileobj is self._stderr:
+                if not chunk:
+                    self._selector.unregister(key.fileobj)
+                    continue
+                self.stderr_output += chunk
+                del self.stderr_output[:-PIPE_BUFFER_SIZE]
+                continue
 
-        # Read response (with timeout handling)
-        response_line = self.process.stdout.readline()
-        if not response_line:
-            raise RuntimeError("No response from MCP server")
+            if not chunk:
+                raise RuntimeError("MCP server closed its output")
+            self._read_buffer += chunk
 
-        return json.loads(response_line)
+            # Split complete newline-delimited messages out of the buffer
+            start = 0
+            while (end := self._read_buffer.find(b"\n", start)) != -1:
+                line = self._read_buffer[start:end]
+                start = end + 1
+                try:
+                    message = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    message = None
+                if not isinstance(message, dict):
+                    # Not a JSON-RPC message (e.g. stray console output);
+                    # keep it with stderr for diagnostics and move on.
+                    self.stderr_output += line + b"\n"
+                    del self.stderr_output[:-PIPE_BUFFER_SIZE]
+                    continue
+                request_id = message.get("id")
+                if request_id is not None and request_id not in self._abandoned:
+                    self._responses[request_id] = message
+                self._abandoned.discard(request_id)
+            del self._read_buffer[:start]
 
-    def call_tool(self, tool_name: str, arguments: dict = None, timeout: int = 120) -> MCPResponse:
+    def _read_response(self, request_id: int, timeout: float = REQUEST_TIMEOUT) -> dict:
+        """Wait for the response to ``request_id``, buffering any others that arrive first."""
+        deadline = time.monotonic() + timeout
+        while request_id not in self._responses:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._abandoned.add(request_id)
+                raise TimeoutError(f"No response from MCP server after {timeout}s")
+            self._poll(remaining)
+        return self._responses.pop(request_id)
+
+    def _send_request(self, method: str, params: dict = None, timeout: float = REQUEST_TIMEOUT) -> dict:
+        """Send a JSON-RPC request to the MCP server."""
+        request_id = self._write_request(method, params)
+        return self._read_response(request_id, timeout)
+
+    def _to_mcp_response(self, response: dict) -> MCPResponse:
+        """Convert a raw ``tools/call`` JSON-RPC response into an MCPResponse."""
+        if "error" in response:
+            return MCPResponse(
+                success=False,
+                content=None,
+                error=response["error"].get("message", str(response["error"])),
+            )
+
+        result = response.get("result", {})
+        content = result.get("content", [])
+
+        # Extract text content; the server returns a single text item, so
+        # check the first entry before scanning the rest.
+        if content and isinstance(content, list):
+            text_content = None
+            if content[0]["type"] == "text":
+                text_content = content[0]["text"]
+            else:
+                for c in content:
+                    if c["type"] == "text":
+                        text_content = c["text"]
+                        break
+
+            # Try to parse as JSON if possible, else return the raw text
+            if text_content:
+                try:
+                    return MCPResponse(success=True, content=orjson.loads(text_content))
+                except orjson.JSONDecodeError:
+                    return MCPResponse(success=True, content=text_content)
+
+        return MCPResponse(success=True, content=result)
+
+    def call_tool(self, tool_name: str, arguments: dict = None, timeout: int = REQUEST_TIMEOUT) -> MCPResponse:
         """
         Call an MCP tool and return the response.
 
@@ -166,76 +689,273 @@ class MCPClient:
             MCPResponse with success status and content
         """
         try:
-            response = self._send_request("tools/call", {
-                "name": tool_name,
-                "arguments": arguments or {},
-            })
-
-            if "error" in response:
-                return MCPResponse(
-                    success=False,
-                    content=None,
-                    error=response["error"].get("message", str(response["error"])),
-                )
-
-            result = response.get("result", {})
-            content = result.get("content", [])
-
-            # Extract text content
-            if content and isinstance(content, list):
-                text_content = next(
-                    (c.get("text") for c in content if c.get("type") == "text"),
-                    None
-                )
-
-                # Try to parse as JSON if possible
-                if text_content:
-                    try:
-                        parsed = json.loads(text_content)
-                        return MCPResponse(success=True, content=parsed)
-                    except json.JSONDecodeError:
-                        return MCPResponse(success=True, content=text_content)
-
-            return MCPResponse(success=True, content=result)
+            request_id = self._write_tool_call(tool_name, arguments)
+            return self._to_mcp_response(self._read_response(request_id, timeout))
 
         except Exception as e:
             return MCPResponse(success=False, content=None, error=str(e))
 
+    def _count_elements(self, selector: str) -> Optional[int]:
+        """Number of elements on the page matching ``selector``, or None if the lookup failed."""
+        response = self.call_tool("get_element_html", {"selector": selector, "limit": 0})
+        match = re.match(r"Found (\d+) ", str(response.content)) if response.success else None
+        return int(match.group(1)) if match else None
+
+    def send_and_await(
+        self,
+        project: str,
+        message: str,
+        timeout: float = RESPONSE_TIMEOUT,
+        interval: float = RESPONSE_POLL_INTERVAL,
+    ) -> MCPResponse:
+        """
+        Send a chat message without waiting server-side, then poll for the reply.
+
+        The server returns from send_message straight away. Every ``interval``
+        seconds the page is probed with the chat selectors from selectors.json
+        that the server's waitForResponse uses: while ``chat.responseInProgress``
+        or ``chat.thinkingIndicator`` is shown the reply is still coming, which
+        costs one get_element_html call per poll. Once neither is shown, a
+        ``chat.errorMessage`` banner fails the call, and with
+        ``chat.responseComplete`` shown a reply that is new (a different
+        conversation or different text than before sending) is returned.
+
+        Returns:
+            The get_response MCPResponse, or a failed one on a chat error or
+            if ``timeout`` elapses
+        """
+        chat = self.call_tool("get_selectors", {"category": "chat"})
+        if not chat.success:
+            return chat
+        busy = _selector_union(chat.content["responseInProgress"], chat.content["thinkingIndicator"])
+        complete = _selector_union(chat.content["responseComplete"])
+        error = _selector_union(chat.content["errorMessage"])
+
+        before_page = self.call_tool("analyze_page").content or {}
+        before = self.call_tool("get_response").content
+        sent = self.call_tool("send_message", {
+            "project": project,
+            "message": message,
+            "wait_for_response": False,
+        })
+        if not sent.success:
+            return sent
+
+        deadline = time.monotonic() + timeout
+        response = None
+        while time.monotonic() < deadline:
+            time.sleep(interval)
+
+            if self._count_elements(busy) != 0:
+                continue
+
+            alert = self.call_tool("get_element_html", {"selector": error, "limit": 1})
+            if alert.success and not str(alert.content).startswith("Found 0 "):
+                text = str(alert.content).lower()
+                if any(word in text for word in CHAT_ERROR_WORDS):
+                    return MCPResponse(success=False, content=None, error=f"Chat error: {alert.content}")
+
+            if not self._count_elements(complete):
+                continue
+
+            response = self.call_tool("get_response")
+            if not response.success or response.content == NO_RESPONSE_TEXT:
+                continue
+            if response.content != before:
+                return response
+            # Same text as before sending, so only new if it is in a new chat
+            page = self.call_tool("analyze_page").content
+            if isinstance(page, dict) and page.get("url") != before_page.get("url"):
+                return response
+
+        return MCPResponse(
+            success=False,
+            content=response.content if response else None,
+            error=f"No response from Claude after {timeout}s",
+        )
+
     def list_tools(self) -> list:
         """List all available tools from the MCP server."""
         response = self._send_request("tools/list")
         return response.get("result", {}).get("tools", [])
 
 
+@functools.lru_cache(maxsize=1)
+def _base_env() -> dict:
+    """Snapshot of os.environ, decoded once and shared by every server start."""
+    return os.environ.copy()
+
+
+def _selector_union(*entries: dict) -> str:
+    """
+    Join the strategies of selectors.json entries into one selector list.
+
+    ``text=`` strategies become Playwright's equivalent ``:text()`` pseudo-class
+    so they can share a comma-separated list with the CSS ones.
+    """
+    strategies = []
+    for entry in entries:
+        for strategy in entry["strategies"]:
+            if strategy.startswith("text="):
+                strategy = f":text({orjson.dumps(strategy[5:]).decode()})"
+            strategies.append(strategy)
+    return ", ".join(strategies)
+
+
+def _profile_login_mtime(profile: Path) -> float:
+    """When the profile's login cookies were last written (0 if it has none)."""
+    mtimes = [
+        (profile / name).stat().st_mtime
+        for name in PROFILE_LOGIN_FILES
+        if (profile / name).exists()
+    ]
+    return max(mtimes, default=0.0)
+
+
+def _worker_chrome_profile() -> Optional[Path]:
+    """
+    Give each xdist worker its own copy of the logged-in browser profile.
+
+    Chromium locks its user data directory, so parallel servers cannot share
+    one. The copy lives next to the base profile as ``<name>-<worker>`` and
+    records the base's login-cookie mtime; it is replaced when the base has
+    logged in again since, unless a browser (e.g. a persistent daemon's) is
+    still using it. Returns None when not running under xdist.
+    """
+    if "PYTEST_XDIST_WORKER" not in os.environ:
+        return None
+
+    base = Path(os.environ.get("CHROME_PROFILE", DEFAULT_CHROME_PROFILE))
+    profile = base.with_name(f"{base.name}-{XDIST_WORKER}")
+    if not base.exists():
+        return profile
+
+    base_mtime = _profile_login_mtime(base)
+    stamp = profile / PROFILE_COPY_STAMP
+    if profile.exists():
+        try:
+            copied_mtime = float(stamp.read_text())
+        except (OSError, ValueError):
+            copied_mtime = 0.0
+        if base_mtime <= copied_mtime:
+            return profile
+        if (profile / "SingletonLock").is_symlink():
+            log.warning("Browser profile %s is in use; not refreshing it from %s", profile, base)
+            return profile
+        shutil.rmtree(profile)
+
+    shutil.copytree(base, profile, ignore=shutil.ignore_patterns("Singleton*"))
+    stamp.write_text(repr(base_mtime))
+    return profile
+
+
+@pytest.fixture(scope="session")
+def teardown_errors(request) -> list:
+    """
+    Session-wide list that cleanup steps append failures to instead of raising.
+
+    The errors are raised together from pytest_sessionfinish, after every
+    MCP server has been killed.
+    """
+    return request.config._mcp_teardown_errors
+
+
 @pytest.fixture(scope="session")
-def mcp_client(request) -> Generator[MCPClient, None, None]:
+def mcp_client(request, teardown_errors: list) -> Generator[MCPClient, None, None]:
     """
     Session-scoped fixture providing an MCP client connected to the server.
+
+    Under pytest-xdist the session is per worker, so each worker gets its
+    own server process. The browser is closed with close_browser at the end
+    of the session, unless it belongs to the persistent daemon.
     """
     headed = request.config.getoption("--headed")
     slow_mo = request.config.getoption("--slow-mo")
+    persistent = request.config.getoption("--mcp-persistent")
 
-    client = MCPClient(headed=headed, slow_mo=slow_mo)
+    client = MCPClient(
+        headed=headed,
+        slow_mo=slow_mo,
+        daemon_socket=DAEMON_SOCKET if persistent else None,
+        daemon_pid_file=_daemon_dir(request.config) / f"daemon_{XDIST_WORKER}.pid",
+        chrome_profile=_worker_chrome_profile(),
+    )
+    request.config._mcp_clients.append(client)
     client.start()
 
-    yield client
+    try:
+        yield client
+    finally:
+        if not persistent:
+            response = client.call_tool("close_browser")
+            if response.success:
+                log.info("close_browser: %s", response.content)
+            else:
+                log.warning("close_browser failed: %s", response.error)
+
+        try:
+            client.stop()
+        except Exception as e:
+            teardown_errors.append(f"Failed to stop MCP server: {e}")
+
+
+def _daemon_dir(config) -> Path:
+    return config.rootpath / ".pytest_cache" / "v" / "mcp"
 
-    client.stop()
+
+def _debug_cache_file(config) -> Path:
+    return config.rootpath / ".pytest_cache" / "v" / "mcp" / f"test_project_{XDIST_WORKER}.pkl"
+
+
+def _load_cached_project(config) -> Optional[dict]:
+    """Return the pickled ``{"name", "info"}`` of a previous run's test project, if any."""
+    if not DEBUG_CACHE:
+        return None
+    try:
+        with open(_debug_cache_file(config), "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def _save_cached_project(config, name: str, info: dict) -> None:
+    cache_file = _debug_cache_file(config)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_file, "wb") as f:
+        pickle.dump({"name": name, "info": info}, f, protocol=pickle.HIGHEST_PROTOCOL)
 
 
 @pytest.fixture(scope="session")
-def test_project_name() -> str:
-    """Generate a unique test project name."""
-    return f"__pytest_test_project_{uuid.uuid4().hex[:8]}"
+def test_project_name(request) -> str:
+    """
+    Generate a unique test project name (distinct per xdist worker).
+
+    With MCP_DEBUG_CACHE=1 the name of the previous run's project is reused.
+    """
+    cached = _load_cached_project(request.config)
+    if cached:
+        return cached["name"]
+    return f"__pytest_{XDIST_WORKER}_{uuid.uuid4().hex[:6]}"
 
 
 @pytest.fixture(scope="session")
-def test_project(mcp_client: MCPClient, test_project_name: str, request) -> Generator[dict, None, None]:
+def test_project(
+    mcp_client: MCPClient, test_project_name: str, teardown_errors: list, request
+) -> Generator[dict, None, None]:
     """
     Session-scoped fixture that creates a test project and cleans it up after.
 
-    Yields the created project info dict.
+    Yields the created project info dict. With MCP_DEBUG_CACHE=1 a project
+    cached by a previous run is reused if it can still be opened, and the
+    project is kept after the session so the next run can reuse it.
     """
+    cached = _load_cached_project(request.config)
+    if cached and cached["name"] == test_project_name:
+        response = mcp_client.call_tool("open_project", {"project": test_project_name})
+        if response.success:
+            yield cached["info"]
+            return
+
     # Create the test project
     response = mcp_client.call_tool("create_project", {
         "name": test_project_name,
@@ -246,15 +966,175 @@ def test_project(mcp_client: MCPClient, test_project_name: str, request) -> Gene
         pytest.fail(f"Failed to create test project: {response.error}")
 
     project_info = response.content
+    if DEBUG_CACHE:
+        _save_cached_project(request.config, test_project_name, project_info)
 
     yield project_info
 
-    # Cleanup: Delete the test project unless --keep-project is set
-    if not request.config.getoption("--keep-project"):
-        mcp_client.call_tool("delete_project", {
+    # Cleanup: Delete the test project unless --keep-project is set or it is
+    # cached for the next debugging run
+    if not request.config.getoption("--keep-project") and not DEBUG_CACHE:
+        response = mcp_client.call_tool("delete_project", {
             "project": test_project_name,
             "confirm": True,
         })
+        if not response.success:
+            teardown_errors.append(f"Failed to delete test project {test_project_name}: {response.error}")
+
+
+def _open_test_project(mcp_client: MCPClient, test_project_name: str) -> None:
+    response = mcp_client.call_tool("open_project", {"project": test_project_name})
+    if not response.success:
+        pytest.fail(f"Failed to open test project: {response.error}")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _project_open(mcp_client: MCPClient, test_project: dict, test_project_name: str) -> None:
+    """Open the session test project once, before the first test runs."""
+    _open_test_project(mcp_client, test_project_name)
+
+
+@pytest.fixture(scope="class")
+def project_page(mcp_client: MCPClient, test_project: dict, test_project_name: str) -> None:
+    """
+    Open the test project page at the start of a class.
+
+    For classes whose tests inspect the current page (e.g. validate_selectors)
+    and must not depend on where earlier classes left the browser.
+    """
+    _open_test_project(mcp_client, test_project_name)
+
+
+@pytest.fixture(scope="session")
+def test_project_id(test_project: dict) -> str:
+    """UUID of the session test project, resolved once from its creation info."""
+    project_id = test_project.get("id") or test_project.get("projectId")
+    if not project_id:
+        pytest.skip("Test project doesn't have an ID")
+    return project_id
+
+
+@pytest.fixture(scope="session")
+def project_snapshot(mcp_client: MCPClient) -> MCPResponse:
+    """
+    Session-scoped list_projects response, fetched once and shared by every
+    test that only needs to inspect the project listing.
+    """
+    return mcp_client.call_tool("list_projects")
+
+
+@pytest.fixture(scope="class")
+def selector_config(mcp_client: MCPClient) -> MCPResponse:
+    """Full get_selectors response, fetched once per class."""
+    return mcp_client.call_tool("get_selectors")
+
+
+@pytest.fixture(scope="class")
+def conversation_list(mcp_client: MCPClient, test_project_name: str) -> MCPResponse:
+    """list_conversations response for the test project, fetched once per class."""
+    return mcp_client.call_tool("list_conversations", {"project": test_project_name})
+
+
+@pytest.fixture(scope="class")
+def first_conversation_id(conversation_list: MCPResponse) -> str:
+    """ID of the first conversation in ``conversation_list`` (skips if there is none)."""
+    if not conversation_list.success or not conversation_list.content:
+        pytest.skip("No conversations available to open")
+
+    conv = conversation_list.content[0]
+    conv_id = conv.get("id") or conv.get("url", "").split("/")[-1]
+    if not conv_id:
+        pytest.skip("Could not extract conversation ID")
+    return conv_id
+
+
+def _delete_kb_files(
+    mcp_client: MCPClient, project: str, file_names, teardown_errors: list
+) -> None:
+    """
+    Delete knowledge base files one after another, recording failures.
+
+    Each delete_file navigates and clicks on the server's single browser
+    page, so the calls must not overlap.
+    """
+    for file_name in file_names:
+        response = mcp_client.call_tool("delete_file", {"project": project, "file_name": file_name})
+        if not response.success:
+            teardown_errors.append(f"Failed to delete test file {file_name}: {response.error}")
+
+
+@pytest.fixture(scope="class")
+def kb_trash(
+    mcp_client: MCPClient, test_project_name: str, teardown_errors: list
+) -> Generator[set, None, None]:
+    """
+    Set of knowledge base file names to delete after the test class.
+
+    Tests add the files they leave behind instead of deleting them inline;
+    they are all deleted in one pass at class teardown.
+    """
+    trash = set()
+    yield trash
+    _delete_kb_files(mcp_client, test_project_name, sorted(trash), teardown_errors)
+
+
+@pytest.fixture(scope="class")
+def kb_file_factory(mcp_client: MCPClient, test_project_name: str, kb_trash: set) -> Any:
+    """
+    Factory creating uniquely named knowledge base files in the test project.
+
+    ``make(content=..., suffix=".md", prefix="kb_", trash=True)`` creates a
+    file and returns its name and the create_file response. Created files
+    are added to ``kb_trash`` unless ``trash`` is False (for tests that
+    delete the file themselves).
+    """
+
+    def make(
+        content: str = "Test content", suffix: str = ".md", prefix: str = "kb_", trash: bool = True
+    ) -> tuple:
+        file_name = f"{prefix}{uuid.uuid4().hex[:8]}{suffix}"
+        response = mcp_client.call_tool("create_file", {
+            "project": test_project_name,
+            "file_name": file_name,
+            "content": content,
+        })
+        if response.success and trash:
+            kb_trash.add(file_name)
+        return file_name, response
+
+    return make
+
+
+def _setup_kb_file(kb_file_factory, content: str, **kwargs) -> str:
+    """Create a file a test depends on, failing the test if that does not work."""
+    file_name, response = kb_file_factory(content, **kwargs)
+    if not response.success:
+        pytest.fail(f"Setup create_file failed: {response.error}")
+    return file_name
+
+
+@pytest.fixture(scope="class")
+def probe_kb_file(kb_file_factory) -> tuple:
+    """
+    One knowledge base file shared by a test class's read/list tests.
+
+    Returns ``(file_name, content)``; the file is deleted with ``kb_trash``.
+    """
+    content = "Content to read back: pytest integration test"
+    return _setup_kb_file(kb_file_factory, content, suffix=".txt", prefix="probe_"), content
+
+
+@pytest.fixture
+def disposable_kb_file(kb_file_factory) -> str:
+    """
+    A fresh knowledge base file for a test that deletes it itself.
+
+    Returns the file name; it is not added to ``kb_trash``, as removing the
+    file is the test's job.
+    """
+    return _setup_kb_file(
+        kb_file_factory, "File to be deleted", suffix=".txt", prefix="delete_test_", trash=False
+    )
 
 
 @pytest.fixture
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Long-lived MCP server daemon for the integration tests.
+
+Spawns the MCP server once and relays its stdio over a Unix socket, so
+successive pytest runs (with --mcp-persistent) connect to the same server
+instead of paying the npx/tsx start-up cost on every invocation. One client
+is served at a time; a new connection replaces the previous one.
+
+The daemon is started on demand by MCPClient and stopped with:
+    pytest --mcp-daemon-stop
+
+Usage:
+    python tests/mcp_daemon.py --socket /tmp/mcp_test_gw0.sock \\
+        --pid-file .pytest_cache/v/mcp/daemon_gw0.pid -- npx tsx src/server.ts
+"""
+
+import argparse
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+
+BUFFER_SIZE = 65536
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--socket", required=True, type=Path, help="Unix socket path to listen on")
+    parser.add_argument("--pid-file", required=True, type=Path, help="File to write the daemon PID to")
+    parser.add_argument("--log-file", type=Path, help="File to append the server's stderr to")
+    parser.add_argument("command", nargs="+", help="Command that starts the MCP server")
+    return parser.parse_args(argv)
+
+
+def serve(args: argparse.Namespace) -> None:
+    """Run the server and relay between it and the connected client until stopped."""
+    server_sock, child_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    log_file = open(args.log_file, "ab") if args.log_file else subprocess.DEVNULL
+    with child_sock:
+        server = subprocess.Popen(
+            args.command,
+            stdin=child_sock,
+            stdout=child_sock,
+            stderr=log_file,
+            start_new_session=True,
+        )
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    args.socket.unlink(missing_ok=True)
+    listener.bind(str(args.socket))
+    listener.listen(1)
+    args.pid_file.parent.mkdir(parents=True, exist_ok=True)
+    args.pid_file.write_text(str(os.getpid()))
+
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ)
+    selector.register(server_sock, selectors.EVENT_READ)
+    client = None
+    # Server output not yet forwarded; only whole messages are sent, so a
+    # client never sees the tail of a response meant for its predecessor.
+    pending = bytearray()
+
+    try:
+        while True:
+            for key, _ in selector.select():
+                if key.fileobj is listener:
+                    if client:
+                        selector.unregister(client)
+                        client.close()
+                    client, _ = listener.accept()
+                    selector.register(client, selectors.EVENT_READ)
+
+                elif key.fileobj is server_sock:
+                    data = server_sock.recv(BUFFER_SIZE)
+                    if not data:
+                        return
+                    pending += data
+                    end = pending.rfind(b"\n") + 1
+                    if end and client:
+                        try:
+                            client.sendall(pending[:end])
+                        except OSError:
+                            pass
+                    del pending[:end]
+
+                else:
+                    data = client.recv(BUFFER_SIZE)
+                    if not data:
+                        selector.unregister(client)
+                        client.close()
+                        client = None
+                    else:
+                        server_sock.sendall(data)
+    finally:
+        try:
+            os.killpg(server.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        server.wait()
+        args.socket.unlink(missing_ok=True)
+        args.pid_file.unlink(missing_ok=True)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # Exit through serve()'s cleanup on SIGTERM as well as Ctrl-C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        serve(args)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,14 +21,19 @@ Tools Tested (23 total):
                    get_page_info, close_browser
 """
 
+import functools
+import graphlib
 import json
 import sys
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import Callable, Any, Optional, List
+from typing import Callable, Any, Optional, List, Tuple
 from enum import Enum
 import uuid
 import time
 
+import orjson
+
 
 class TestStatus(Enum):
     PENDING = "pending"
@@ -38,7 +43,7 @@ class TestStatus(Enum):
     SKIPPED = "skipped"
 
 
-@dataclass
+@dataclass(slots=True)
 class TestResult:
     name: str
     tool: str
@@ -48,7 +53,7 @@ class TestResult:
     response: Any = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TestCase:
     """Defines a test case for an MCP tool."""
     name: str
@@ -56,12 +61,15 @@ class TestCase:
     description: str
     args: dict = field(default_factory=dict)
     expected_success: bool = True
-    validator: Optional[Callable[[Any], tuple[bool, str]]] = None
+    validator: Optional[Callable[..., tuple[bool, str]]] = None
     cleanup_tool: Optional[str] = None
     cleanup_args: Optional[dict] = None
     depends_on: Optional[str] = None  # Name of test this depends on
     setup_tool: Optional[str] = None
     setup_args: Optional[dict] = None
+    # Runs after every earlier test and before every later one (for tests
+    # that change state other tests read, e.g. deletes)
+    sequential: bool = False
 
 
 # Unique test project name for this run
@@ -69,28 +77,43 @@ TEST_PROJECT_NAME = f"__mcp_integration_test_{uuid.uuid4().hex[:8]}"
 TEST_FILE_NAME = f"test_file_{uuid.uuid4().hex[:6]}.md"
 TEST_FILE_CONTENT = "# Test File\n\nCreated by MCP integration tests.\n\nLine 4."
 
+# Validators take the decoded response. Substring validators from
+# validate_contains() also accept its lowercased text from response_text(),
+# which CompositeValidator computes once per response and shares between them
+# instead of each one re-stringifying.
+
+def response_text(response) -> bytes:
+    """Return the lowercased text of a response, for substring validators."""
+    if type(response) is str:
+        return response.encode().lower()
+    return orjson.dumps(response, default=str, option=orjson.OPT_SORT_KEYS).lower()
+
 
 def validate_list(response) -> tuple[bool, str]:
     """Validator: response should be a list."""
-    if isinstance(response, list):
+    if type(response) is list:
         return True, f"Got list with {len(response)} items"
     return False, f"Expected list, got {type(response).__name__}"
 
 
 def validate_dict(response) -> tuple[bool, str]:
     """Validator: response should be a dict."""
-    if isinstance(response, dict):
+    if type(response) is dict:
         return True, f"Got dict with keys: {list(response.keys())[:5]}"
     return False, f"Expected dict, got {type(response).__name__}"
 
 
 def validate_contains(substring: str):
-    """Validator factory: response should contain substring."""
-    def validator(response) -> tuple[bool, str]:
-        response_str = str(response).lower()
-        if substring.lower() in response_str:
+    """Validator factory: response should contain substring (case-insensitive)."""
+    needle = substring.lower().encode()
+
+    def validator(response, response_lower: Optional[bytes] = None) -> tuple[bool, str]:
+        if response_lower is None:
+            response_lower = response_text(response)
+        if needle in response_lower:
             return True, f"Response contains '{substring}'"
         return False, f"Response does not contain '{substring}'"
+    validator.takes_response_text = True
     return validator
 
 
@@ -106,18 +129,41 @@ def validate_project_opened(response) -> tuple[bool, str]:
 
 def validate_not_empty(response) -> tuple[bool, str]:
     """Validator: response should not be empty."""
-    if response and str(response).strip():
+    if response and (type(response) is not str or response.strip()):
         return True, "Got non-empty response"
     return False, "Response was empty"
 
 
+class CompositeValidator:
+    """Validator that runs several validators in order, stopping at the first failure."""
+
+    def __init__(self, *validators: Callable[..., tuple[bool, str]]):
+        self.validators = validators
+
+    def __call__(self, response) -> tuple[bool, str]:
+        response_lower = None
+        messages = []
+        for validator in self.validators:
+            if getattr(validator, "takes_response_text", False):
+                if response_lower is None:
+                    response_lower = response_text(response)
+                ok, message = validator(response, response_lower)
+            else:
+                ok, message = validator(response)
+            if not ok:
+                return False, message
+            messages.append(message)
+        return True, "; ".join(messages)
+
+
 # =============================================================================
 # TEST DEFINITIONS - All 23 MCP Tools
 # =============================================================================
 
-def get_all_tests() -> List[TestCase]:
-    """Return all test cases in execution order."""
-    return [
+@functools.lru_cache(maxsize=1)
+def get_all_tests() -> Tuple[TestCase, ...]:
+    """Return all test cases in execution order (built once and shared)."""
+    return (
         # --- UTILITY TESTS (run first to verify basic connectivity) ---
         TestCase(
             name="test_get_page_info",
@@ -199,8 +245,9 @@ def get_all_tests() -> List[TestCase]:
                 "project": TEST_PROJECT_NAME,
                 "instructions": f"Updated instructions at {time.time()}. Be brief.",
             },
-            validator=validate_contains("updated"),
+            validator=CompositeValidator(validate_not_empty, validate_contains("updated")),
             depends_on="test_create_project",
+            sequential=True,
         ),
 
         # --- FILE/KNOWLEDGE TESTS ---
@@ -223,6 +270,7 @@ def get_all_tests() -> List[TestCase]:
             },
             validator=validate_contains("created"),
             depends_on="test_create_project",
+            sequential=True,
         ),
         TestCase(
             name="test_list_project_files_with_file",
@@ -240,7 +288,7 @@ def get_all_tests() -> List[TestCase]:
                 "project": TEST_PROJECT_NAME,
                 "file_name": TEST_FILE_NAME,
             },
-            validator=validate_contains("Test File"),
+            validator=CompositeValidator(validate_not_empty, validate_contains("Test File")),
             depends_on="test_create_file",
         ),
         TestCase(
@@ -253,6 +301,7 @@ def get_all_tests() -> List[TestCase]:
             },
             validator=validate_contains("deleted"),
             depends_on="test_create_file",
+            sequential=True,
         ),
 
         # --- CHAT TESTS ---
@@ -336,6 +385,7 @@ def get_all_tests() -> List[TestCase]:
             },
             validator=validate_contains("deleted"),
             depends_on="test_create_project",
+            sequential=True,
         ),
 
         # --- CLOSE BROWSER (run last) ---
@@ -346,55 +396,124 @@ def get_all_tests() -> List[TestCase]:
         #     description="Close the browser instance",
         #     validator=validate_contains("closed"),
         # ),
-    ]
+    )
+
+
+def get_schedule() -> List[List[TestCase]]:
+    """
+    Return the tests as stages, in the order they should be executed.
+
+    Stages are a topological sort of the depends_on edges, with sequential
+    tests kept in list order relative to every other test. Stages are
+    ordering information only: the server drives a single browser page, so
+    tests in the same stage still run one at a time, in list order, so each
+    test runs on the page the tests listed before it left open.
+    """
+    tests = get_all_tests()
+    position = {t.name: i for i, t in enumerate(tests)}
+    sorter = graphlib.TopologicalSorter()
+    for i, test in enumerate(tests):
+        sorter.add(test.name)
+        if test.depends_on:
+            sorter.add(test.name, test.depends_on)
+        if test.sequential:
+            for other in tests[:i]:
+                sorter.add(test.name, other.name)
+            for other in tests[i + 1:]:
+                sorter.add(other.name, test.name)
+
+    stages = []
+    sorter.prepare()
+    while sorter.is_active():
+        ready = sorter.get_ready()
+        stages.append(sorted((tests[position[name]] for name in ready), key=lambda t: position[t.name]))
+        sorter.done(*ready)
+    return stages
 
 
 def print_test_plan():
     """Print the test plan for review."""
     tests = get_all_tests()
-    print("\n" + "=" * 70)
-    print("CLAUDE PROJECT MCP INTEGRATION TEST PLAN")
-    print("=" * 70)
-    print(f"\nTest Project Name: {TEST_PROJECT_NAME}")
-    print(f"Test File Name: {TEST_FILE_NAME}")
-    print(f"\nTotal Tests: {len(tests)}")
-    print("\nTools to be tested:")
-
-    tools_tested = set(t.tool for t in tests)
-    for tool in sorted(tools_tested):
-        count = sum(1 for t in tests if t.tool == tool)
-        print(f"  - {tool} ({count} test{'s' if count > 1 else ''})")
-
-    print("\n" + "-" * 70)
-    print("TEST EXECUTION ORDER:")
-    print("-" * 70)
-    for i, test in enumerate(tests, 1):
-        deps = f" [depends: {test.depends_on}]" if test.depends_on else ""
-        print(f"{i:2}. {test.name}")
-        print(f"    Tool: {test.tool}")
-        print(f"    Desc: {test.description}{deps}")
-        if test.args:
-            args_str = json.dumps(test.args, indent=8)
-            print(f"    Args: {args_str}")
-        print()
+    lines: List[str] = [
+        "\n" + "=" * 70,
+        "CLAUDE PROJECT MCP INTEGRATION TEST PLAN",
+        "=" * 70,
+        f"\nTest Project Name: {TEST_PROJECT_NAME}",
+        f"Test File Name: {TEST_FILE_NAME}",
+        f"\nTotal Tests: {len(tests)}",
+        "\nTools to be tested:",
+    ]
+
+    counts = Counter(t.tool for t in tests)
+    for tool, count in sorted(counts.items()):
+        lines.append(f"  - {tool} ({count} test{'s' if count > 1 else ''})")
+
+    number = {t.name: i for i, t in enumerate(tests, 1)}
+    lines += ["\n" + "-" * 70, "TEST EXECUTION ORDER:", "-" * 70]
+    for stage_number, stage in enumerate(get_schedule(), 1):
+        lines.append(f"\n## Stage {stage_number}\n")
+        for test in stage:
+            deps = f" [depends: {test.depends_on}]" if test.depends_on else ""
+            lines.append(f"{number[test.name]:2}. {test.name}")
+            lines.append(f"    Tool: {test.tool}")
+            lines.append(f"    Desc: {test.description}{deps}")
+            if test.args:
+                args_str = json.dumps(test.args, indent=8)
+                lines.append(f"    Args: {args_str}")
+            lines.append("")
+
+    write_lines(lines)
 
 
 def generate_test_commands():
     """Generate the MCP tool commands to execute."""
     tests = get_all_tests()
-    print("\n" + "=" * 70)
-    print("MCP TOOL COMMANDS TO EXECUTE")
-    print("=" * 70)
-    print("\nExecute these tools in order using Claude Code:\n")
+    number = {t.name: i for i, t in enumerate(tests, 1)}
+    lines: List[str] = [
+        "\n" + "=" * 70,
+        "MCP TOOL COMMANDS TO EXECUTE",
+        "=" * 70,
+        "\nExecute the commands in order using Claude Code, one at a time. Stages",
+        "group tests whose dependencies are met; the server drives a single",
+        "browser page, so tests within a stage must not run concurrently either.",
+    ]
+
+    previous_setup = None
+    for stage_number, stage in enumerate(get_schedule(), 1):
+        lines.append(f"\n## Stage {stage_number}\n")
+        for test in stage:
+            # Skip a setup call identical to the one just issued
+            if test.setup_tool:
+                setup = (test.setup_tool, tuple(sorted((test.setup_args or {}).items())))
+                if setup != previous_setup:
+                    lines.append(f"# Setup for test {number[test.name]}")
+                    lines.append(format_tool_call(test.setup_tool, test.setup_args))
+                    previous_setup = setup
+            lines += format_test_command(number[test.name], test)
+
+    write_lines(lines)
+
+
+def format_tool_call(tool: str, args: Optional[dict]) -> str:
+    """Return the MCP tool invocation string for a tool and its arguments."""
+    if args:
+        return f"mcp__claude-project__{tool}({json.dumps(args, separators=(',', ':'))})"
+    return f"mcp__claude-project__{tool}()"
+
+
+def format_test_command(i: int, test: TestCase) -> List[str]:
+    """Return the output lines for a single test's MCP tool command."""
+    return [
+        f"# Test {i}: {test.name}",
+        f"# {test.description}",
+        format_tool_call(test.tool, test.args),
+        "",
+    ]
+
 
-    for i, test in enumerate(tests, 1):
-        print(f"# Test {i}: {test.name}")
-        print(f"# {test.description}")
-        if test.args:
-            print(f"mcp__claude-project__{test.tool}({json.dumps(test.args)})")
-        else:
-            print(f"mcp__claude-project__{test.tool}()")
-        print()
+def write_lines(lines: List[str]):
+    """Write all output lines to stdout with a single write call."""
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
@@ -402,6 +521,8 @@ if __name__ == "__main__":
         generate_test_commands()
     else:
         print_test_plan()
-        print("\nTo generate executable commands, run with --commands flag")
-        print("\nTo execute tests, ask Claude Code to:")
-        print('  "Run the MCP integration tests in tests/run_integration_tests.py"')
+        write_lines([
+            "\nTo generate executable commands, run with --commands flag",
+            "\nTo execute tests, ask Claude Code to:",
+            '  "Run the MCP integration tests in tests/run_integration_tests.py"',
+        ])
@@ -5,6 +5,16 @@ This test suite covers ALL 23 MCP tools with real browser automation against Cla
 
 Run with: pytest tests/test_mcp_integration.py -v --run-integration
 
+Tests marked "slow" (e.g. full page screenshots) are deselected by default;
+the nightly run includes them:
+    pytest tests/test_mcp_integration.py -v --run-integration -m "slow or integration"
+
+Run in parallel with pytest-xdist:
+    pytest tests/test_mcp_integration.py -v --run-integration -n auto --dist=loadscope
+
+With --dist=loadscope each test class runs whole on one worker, and every
+worker has its own MCP server and test project.
+
 Tools tested:
   Project Tools (8):
     - list_projects
@@ -35,7 +45,7 @@ Tools tested:
     - reload_selectors
     - get_selectors
     - get_page_info
-    - close_browser
+    - close_browser (called by the mcp_client fixture's teardown)
 """
 
 import pytest
@@ -52,12 +62,12 @@ from pathlib import Path
 class TestProjectTools:
     """Tests for project CRUD operations."""
 
-    def test_list_projects(self, mcp_client):
+    def test_list_projects(self, project_snapshot):
         """
         Test: list_projects
         Should return a list of existing projects.
         """
-        response = mcp_client.call_tool("list_projects")
+        response = project_snapshot
 
         assert response.success, f"list_projects failed: {response.error}"
         assert isinstance(response.content, list), "Expected list of projects"
@@ -69,26 +79,16 @@ class TestProjectTools:
             assert "name" in project, "Project should have 'name' field"
             assert "url" in project, "Project should have 'url' field"
 
-    def test_create_project(self, mcp_client):
+    def test_create_project(self, test_project, test_project_name):
         """
         Test: create_project
         Should create a new project and return its details.
-        """
-        unique_name = f"__pytest_create_test_{uuid.uuid4().hex[:8]}"
-
-        response = mcp_client.call_tool("create_project", {
-            "name": unique_name,
-            "instructions": "Test instructions for pytest",
-        })
 
-        assert response.success, f"create_project failed: {response.error}"
-        assert response.content is not None
-
-        # Clean up: delete the created project
-        mcp_client.call_tool("delete_project", {
-            "project": unique_name,
-            "confirm": True,
-        })
+        The session-scoped test_project fixture performs the actual
+        create_project call; this test checks what it returned.
+        """
+        assert test_project is not None
+        assert test_project["name"] == test_project_name
 
     def test_open_project(self, mcp_client, test_project, test_project_name):
         """
@@ -106,17 +106,13 @@ class TestProjectTools:
         assert "conversations" in response.content
         assert "files" in response.content
 
-    def test_open_project_by_id(self, mcp_client, test_project):
+    def test_open_project_by_id(self, mcp_client, test_project_id):
         """
         Test: open_project (by ID)
         Should open a project using its UUID.
         """
-        project_id = test_project.get("id") or test_project.get("projectId")
-        if not project_id:
-            pytest.skip("Test project doesn't have an ID")
-
         response = mcp_client.call_tool("open_project", {
-            "project": project_id,
+            "project": test_project_id,
         })
 
         assert response.success, f"open_project by ID failed: {response.error}"
@@ -216,46 +212,23 @@ class TestFileTools:
         assert response.success, f"list_project_files failed: {response.error}"
         assert isinstance(response.content, list)
 
-    def test_create_file(self, mcp_client, test_project_name):
+    def test_create_file(self, kb_file_factory):
         """
         Test: create_file
         Should create a new text file in the project's knowledge base.
         """
-        file_name = f"test_file_{uuid.uuid4().hex[:8]}.md"
-        file_content = "# Test File\n\nThis is test content created by pytest."
-
-        response = mcp_client.call_tool("create_file", {
-            "project": test_project_name,
-            "file_name": file_name,
-            "content": file_content,
-        })
+        _, response = kb_file_factory("# Test File\n\nThis is test content created by pytest.")
 
         assert response.success, f"create_file failed: {response.error}"
         assert "created" in str(response.content).lower()
 
-        # Clean up
-        mcp_client.call_tool("delete_file", {
-            "project": test_project_name,
-            "file_name": file_name,
-        })
-
-    def test_read_file(self, mcp_client, test_project_name):
+    def test_read_file(self, mcp_client, test_project_name, probe_kb_file):
         """
         Test: read_file
         Should read content of a file in the knowledge base.
         """
-        # First create a file
-        file_name = f"read_test_{uuid.uuid4().hex[:8]}.txt"
-        expected_content = "Content to read back: pytest integration test"
-
-        create_response = mcp_client.call_tool("create_file", {
-            "project": test_project_name,
-            "file_name": file_name,
-            "content": expected_content,
-        })
-        assert create_response.success, f"Setup create_file failed: {create_response.error}"
+        file_name, expected_content = probe_kb_file
 
-        # Now read it back
         response = mcp_client.call_tool("read_file", {
             "project": test_project_name,
             "file_name": file_name,
@@ -265,13 +238,7 @@ class TestFileTools:
         # Content should contain what we wrote
         assert "pytest" in str(response.content).lower() or expected_content in str(response.content)
 
-        # Clean up
-        mcp_client.call_tool("delete_file", {
-            "project": test_project_name,
-            "file_name": file_name,
-        })
-
-    def test_upload_file(self, mcp_client, test_project_name, temp_test_file):
+    def test_upload_file(self, mcp_client, test_project_name, temp_test_file, kb_trash):
         """
         Test: upload_file
         Should upload a local file to the project's knowledge base.
@@ -282,53 +249,29 @@ class TestFileTools:
         })
 
         assert response.success, f"upload_file failed: {response.error}"
+        kb_trash.add(temp_test_file.name)
         assert "uploaded" in str(response.content).lower()
 
-        # Clean up - delete the uploaded file
-        mcp_client.call_tool("delete_file", {
-            "project": test_project_name,
-            "file_name": temp_test_file.name,
-        })
-
-    def test_delete_file(self, mcp_client, test_project_name):
+    def test_delete_file(self, mcp_client, test_project_name, disposable_kb_file):
         """
         Test: delete_file
         Should delete a file from the project's knowledge base.
         """
-        # First create a file to delete
-        file_name = f"delete_test_{uuid.uuid4().hex[:8]}.txt"
-
-        create_response = mcp_client.call_tool("create_file", {
-            "project": test_project_name,
-            "file_name": file_name,
-            "content": "File to be deleted",
-        })
-        assert create_response.success
-
-        # Now delete it
         response = mcp_client.call_tool("delete_file", {
             "project": test_project_name,
-            "file_name": file_name,
+            "file_name": disposable_kb_file,
         })
 
         assert response.success, f"delete_file failed: {response.error}"
         assert "deleted" in str(response.content).lower()
 
-    def test_list_project_files_after_create(self, mcp_client, test_project_name):
+    def test_list_project_files_after_create(self, mcp_client, test_project_name, probe_kb_file):
         """
         Test: list_project_files (after creating files)
         Should show the created file in the list.
         """
-        file_name = f"list_test_{uuid.uuid4().hex[:8]}.md"
-
-        # Create a file
-        mcp_client.call_tool("create_file", {
-            "project": test_project_name,
-            "file_name": file_name,
-            "content": "Test content",
-        })
+        file_name, _ = probe_kb_file
 
-        # List files
         response = mcp_client.call_tool("list_project_files", {
             "project": test_project_name,
         })
@@ -340,12 +283,6 @@ class TestFileTools:
         file_names = [f.get("name", f.get("filename", "")) for f in response.content]
         assert any(file_name in name for name in file_names), f"Created file not in list: {file_names}"
 
-        # Clean up
-        mcp_client.call_tool("delete_file", {
-            "project": test_project_name,
-            "file_name": file_name,
-        })
-
 
 # =============================================================================
 # CHAT TOOLS TESTS (4 tools)
@@ -359,6 +296,9 @@ class TestChatTools:
         """
         Test: send_message
         Should send a message and get a response from Claude.
+
+        Uses the server-side wait (wait_for_response=True); the other chat
+        tests poll from the client with send_and_await.
         """
         response = mcp_client.call_tool("send_message", {
             "project": test_project_name,
@@ -391,11 +331,8 @@ class TestChatTools:
         Should get the last response from Claude.
         """
         # First send a message
-        mcp_client.call_tool("send_message", {
-            "project": test_project_name,
-            "message": "Say hello",
-            "wait_for_response": True,
-        })
+        sent = mcp_client.send_and_await(test_project_name, "Say hello")
+        assert sent.success, f"send_and_await failed: {sent.error}"
 
         # Now get the response
         response = mcp_client.call_tool("get_response")
@@ -404,44 +341,23 @@ class TestChatTools:
         # Should have some content
         assert response.content is not None
 
-    def test_list_conversations(self, mcp_client, test_project_name):
+    def test_list_conversations(self, conversation_list):
         """
         Test: list_conversations
         Should list conversations in the project.
         """
-        response = mcp_client.call_tool("list_conversations", {
-            "project": test_project_name,
-        })
+        response = conversation_list
 
         assert response.success, f"list_conversations failed: {response.error}"
         assert isinstance(response.content, list)
 
-    def test_open_conversation(self, mcp_client, test_project_name):
+    def test_open_conversation(self, mcp_client, first_conversation_id):
         """
         Test: open_conversation
         Should open an existing conversation.
         """
-        # First list conversations to get an ID
-        list_response = mcp_client.call_tool("list_conversations", {
-            "project": test_project_name,
-        })
-
-        if not list_response.success or not list_response.content:
-            pytest.skip("No conversations available to open")
-
-        conversations = list_response.content
-        if len(conversations) == 0:
-            pytest.skip("No conversations available to open")
-
-        # Get first conversation ID
-        conv = conversations[0]
-        conv_id = conv.get("id") or conv.get("url", "").split("/")[-1]
-
-        if not conv_id:
-            pytest.skip("Could not extract conversation ID")
-
         response = mcp_client.call_tool("open_conversation", {
-            "conversation_id": conv_id,
+            "conversation_id": first_conversation_id,
         })
 
         assert response.success, f"open_conversation failed: {response.error}"
@@ -452,6 +368,7 @@ class TestChatTools:
 # =============================================================================
 
 @pytest.mark.integration
+@pytest.mark.usefixtures("project_page")
 class TestDebugTools:
     """Tests for debug and utility operations."""
 
@@ -468,42 +385,30 @@ class TestDebugTools:
         assert "title" in response.content
         assert "context" in response.content
 
-    def test_take_screenshot(self, mcp_client, tmp_path):
+    @pytest.mark.parametrize("full_page", [False, pytest.param(True, marks=pytest.mark.slow)])
+    def test_take_screenshot(self, mcp_client, full_page):
         """
         Test: take_screenshot
-        Should capture a screenshot of the current browser state.
+        Should capture a screenshot of the current browser state. The full
+        page variant is marked slow and only runs when slow tests are selected.
         """
         response = mcp_client.call_tool("take_screenshot", {
-            "label": "pytest_test",
+            "label": "pytest_fullpage" if full_page else "pytest_test",
+            "full_page": full_page,
         })
 
-        assert response.success, f"take_screenshot failed: {response.error}"
+        assert response.success, f"take_screenshot (full_page={full_page}) failed: {response.error}"
         assert "screenshot" in str(response.content).lower() or "saved" in str(response.content).lower()
 
-    def test_take_screenshot_full_page(self, mcp_client):
-        """
-        Test: take_screenshot (full page)
-        Should capture a full page screenshot.
-        """
-        response = mcp_client.call_tool("take_screenshot", {
-            "label": "pytest_fullpage",
-            "full_page": True,
-        })
-
-        assert response.success, f"take_screenshot (full page) failed: {response.error}"
-        assert "screenshot" in str(response.content).lower() or "saved" in str(response.content).lower()
-
-    def test_get_selectors(self, mcp_client):
+    def test_get_selectors(self, selector_config):
         """
         Test: get_selectors
         Should return the current selector configuration.
         """
-        response = mcp_client.call_tool("get_selectors")
-
-        assert response.success, f"get_selectors failed: {response.error}"
-        assert isinstance(response.content, dict)
+        assert selector_config.success, f"get_selectors failed: {selector_config.error}"
+        assert isinstance(selector_config.content, dict)
 
-    def test_get_selectors_by_category(self, mcp_client):
+    def test_get_selectors_by_category(self, mcp_client, selector_config):
         """
         Test: get_selectors (specific category)
         Should return selectors for a specific category.
@@ -513,6 +418,8 @@ class TestDebugTools:
         })
 
         assert response.success, f"get_selectors (category) failed: {response.error}"
+        if selector_config.success:
+            assert response.content == selector_config.content.get("chat")
 
     def test_reload_selectors(self, mcp_client):
         """
@@ -524,26 +431,21 @@ class TestDebugTools:
         assert response.success, f"reload_selectors failed: {response.error}"
         assert "reload" in str(response.content).lower()
 
-    def test_validate_selectors(self, mcp_client, test_project_name):
+    def test_validate_selectors(self, mcp_client):
         """
         Test: validate_selectors
         Should validate that selectors work on the current page.
         """
-        # First open a project to have content on the page
-        mcp_client.call_tool("open_project", {"project": test_project_name})
-
         response = mcp_client.call_tool("validate_selectors")
 
         assert response.success, f"validate_selectors failed: {response.error}"
         # Should return validation results
 
-    def test_validate_selectors_by_category(self, mcp_client, test_project_name):
+    def test_validate_selectors_by_category(self, mcp_client):
         """
         Test: validate_selectors (specific category)
         Should validate selectors for a specific category.
         """
-        mcp_client.call_tool("open_project", {"project": test_project_name})
-
         response = mcp_client.call_tool("validate_selectors", {
             "category": "chat",
         })
@@ -599,11 +501,7 @@ class TestFullWorkflow:
             assert create_file_response.success, f"Step 3 (create_file) failed: {create_file_response.error}"
 
             # 4. Send a message
-            send_response = mcp_client.call_tool("send_message", {
-                "project": project_name,
-                "message": "What file do you have access to?",
-                "wait_for_response": True,
-            })
+            send_response = mcp_client.send_and_await(project_name, "What file do you have access to?")
             assert send_response.success, f"Step 4 (send_message) failed: {send_response.error}"
 
             # 5. Get response
@@ -635,28 +533,3 @@ class TestFullWorkflow:
                 "confirm": True,
             })
             # Don't assert here - we want cleanup to happen even if earlier steps failed
-
-
-# =============================================================================
-# CLOSE BROWSER TEST (must be last)
-# =============================================================================
-
-@pytest.mark.integration
-class TestCloseBrowser:
-    """
-    Test for close_browser tool.
-    NOTE: This should run LAST as it terminates the browser session.
-    """
-
-    @pytest.mark.order("last")
-    def test_close_browser(self, mcp_client):
-        """
-        Test: close_browser
-        Should close the browser instance.
-
-        This test is marked to run last since it closes the browser.
-        """
-        response = mcp_client.call_tool("close_browser")
-
-        assert response.success, f"close_browser failed: {response.error}"
-        assert "closed" in str(response.content).lower()